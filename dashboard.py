@@ -6,11 +6,49 @@ import numpy as np
 from datetime import datetime
 
 import base64
-
-def add_bg_local(image_file):
+import os
+import pickle
+
+from prepare_data import (CSV_FILE, PARQUET_FILE, as_categorical_keys,
+                          read_daily_csv, standardize_columns)
+
+# Downsampling LTTB côté serveur (plotly-resampler) pour les traces en résolution
+# journalière : on n'envoie que ~1500 points par trace au navigateur quelle que
+# soit la taille de la série. Dépendance optionnelle : repli sur les traces brutes.
+try:
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
+# Fragments de layout partagés, construits une fois à l'import au lieu d'un
+# dict/list par figure à chaque rerun
+BASE_LAYOUT = dict(hovermode='x unified', height=500)
+MONTH_TICKS = dict(tickmode='array',
+                   tickvals=list(range(1, 13)),
+                   ticktext=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                             'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+
+def make_resampled_figure():
+    if FigureResampler is not None:
+        return FigureResampler(go.Figure(), default_n_shown_samples=1500)
+    return go.Figure()
+
+def add_daily_trace(fig, x, y, **scatter_kwargs):
+    # Scattergl : rendu WebGL (coût ~O(pixels)) plutôt que des noeuds SVG par
+    # point pour les traces en résolution journalière ; les figures d'agrégats
+    # annuels restent en SVG, où le hover/les labels sont meilleurs
+    if FigureResampler is not None:
+        fig.add_trace(go.Scattergl(**scatter_kwargs), hf_x=x, hf_y=y)
+    else:
+        fig.add_trace(go.Scattergl(x=x, y=y, **scatter_kwargs))
+
+# La lecture + l'encodage base64 de l'image sont mis en cache : seul le
+# st.markdown est ré-exécuté à chaque rerun, pas l'I/O
+@st.cache_data
+def background_css(image_file):
     with open(image_file, "rb") as f:
         encoded = base64.b64encode(f.read()).decode()
-    css = f"""
+    return f"""
     <style>
     .stApp {{
         background-image: url("data:image/png;base64,{encoded}");
@@ -18,7 +56,9 @@ def add_bg_local(image_file):
     }}
     </style>
     """
-    st.markdown(css, unsafe_allow_html=True)
+
+def add_bg_local(image_file):
+    st.markdown(background_css(image_file), unsafe_allow_html=True)
 
 add_bg_local("fondecolo.jpg")
 
@@ -27,64 +67,14 @@ add_bg_local("fondecolo.jpg")
 def load_data():
 
     try:
-        df = pd.read_csv('Station_Agroclim_INRAE_11170004_daily_1989_2024.csv')
-        
-        # Détection automatique de la colonne de date
-        date_cols = [col for col in df.columns if 'date' in col.lower() or 'time' in col.lower()]
-        if date_cols:
-            df['Date'] = pd.to_datetime(df[date_cols[0]])
-        else:
-            # Si pas de colonne date explicite, essayer la première colonne
-            df['Date'] = pd.to_datetime(df.iloc[:, 0])
-        
-        # Extraction des composants temporels
-        df['Year'] = df['Date'].dt.year
-        df['Month'] = df['Date'].dt.month
-        df['Day'] = df['Date'].dt.day
-        df['Month_Name'] = df['Date'].dt.strftime('%B')
-        df['Season'] = df['Month'].map({
-            12: 'Winter', 1: 'Winter', 2: 'Winter',
-            3: 'Spring', 4: 'Spring', 5: 'Spring',
-            6: 'Summer', 7: 'Summer', 8: 'Summer',
-            9: 'Fall', 10: 'Fall', 11: 'Fall'
-        })
-        
-        # Identification des colonnes de température (colonnes contenant 'temp', 'T_', 'TX', 'TN', etc.)
-        temp_cols = [col for col in df.columns if any(x in col.lower() for x in ['temp', 't_', 'tx', 'tn', 'tg'])]
-        
-        # Identification des colonnes de précipitations
-        precip_cols = [col for col in df.columns if any(x in col.lower() for x in ['precip', 'rain', 'rr', 'pluvio', 'pluie'])]
-        
-        # Si on trouve des colonnes, on les renomme de manière standard
-        if temp_cols:
-            # Chercher température moyenne
-            temp_mean_cols = [col for col in temp_cols if 'mean' in col.lower() or 'avg' in col.lower() or 'tg' in col.lower() or 'moy' in col.lower()]
-            if temp_mean_cols:
-                df['Temp_Mean'] = df[temp_mean_cols[0]]
-            elif len(temp_cols) >= 2:
-                # Si on a min et max, calculer la moyenne
-                df['Temp_Mean'] = (df[temp_cols[0]] + df[temp_cols[1]]) / 2
-            else:
-                df['Temp_Mean'] = df[temp_cols[0]]
-            
-            # Chercher température max
-            temp_max_cols = [col for col in temp_cols if 'max' in col.lower() or 'tx' in col.lower()]
-            if temp_max_cols:
-                df['Temp_Max'] = df[temp_max_cols[0]]
-            
-            # Chercher température min
-            temp_min_cols = [col for col in temp_cols if 'min' in col.lower() or 'tn' in col.lower()]
-            if temp_min_cols:
-                df['Temp_Min'] = df[temp_min_cols[0]]
-        
-        if precip_cols:
-            df['Precipitation'] = df[precip_cols[0]]
-        
-        # Nettoyage des valeurs manquantes
-        df = df.dropna(subset=['Date'])
-        
-        return df
-        
+        # Le Parquet pré-typé (voir prepare_data.py) évite le parsing CSV et le
+        # to_datetime à chaque démarrage à froid ; le CSV reste le repli
+        if os.path.exists(PARQUET_FILE):
+            return as_categorical_keys(pd.read_parquet(PARQUET_FILE, engine='pyarrow'))
+
+        df = read_daily_csv()
+        return standardize_columns(df)
+
     except FileNotFoundError:
         st.error("Fichier non trouvé. Veuillez vous assurer que le fichier CSV est dans le même répertoire que le script.")
         st.stop()
@@ -93,8 +83,126 @@ def load_data():
         st.info("Structure détectée des colonnes pour débogage :")
         st.stop()
 
+def grouped_sum_count(codes, values, size):
+    """Somme et effectif par groupe en un seul passage NumPy.
+
+    `codes` sont les codes catégoriels (0..size-1) ; les NaN de `values` sont
+    exclus, comme pour un groupby avec skipna. Évite la machinerie de groupby
+    (hash/tri/take) pour les réductions annuelles et le pivot mensuel.
+    """
+    valid = ~np.isnan(values)
+    codes = codes[valid]
+    values = values[valid]
+    sums = np.bincount(codes, weights=values, minlength=size)
+    counts = np.bincount(codes, minlength=size)
+    return sums, counts
+
+
+def grouped_mean(codes, values, size):
+    sums, counts = grouped_sum_count(codes, values, size)
+    return np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+
+
+# Pré-calcul des agrégats annuels/mensuels : de petites tables réutilisées par
+# toutes les pages, pour ne pas re-scanner les ~13k lignes journalières à chaque rerun
+def build_aggregates(df):
+    aggs = {}
+
+    # Codes catégoriels bruts : une réduction bincount par agrégat, en un passage
+    year_codes = df['Year'].cat.codes.to_numpy().astype(np.int64)
+    month_codes = df['Month'].cat.codes.to_numpy().astype(np.int64)
+    years = np.asarray(df['Year'].cat.categories)
+    n_years = len(years)
+
+    if 'Temp_Mean' in df.columns:
+        temp = df['Temp_Mean'].to_numpy(dtype=np.float64)
+        aggs['yearly_temp'] = pd.DataFrame({
+            'Year': years,
+            'Temp_Mean': grouped_mean(year_codes, temp, n_years)
+        })
+        monthly_means = grouped_mean(year_codes * 12 + month_codes, temp, n_years * 12)
+        # comme pivot_table(dropna=True) : on écarte les années sans aucune mesure
+        aggs['monthly_pivot'] = pd.DataFrame(
+            monthly_means.reshape(n_years, 12).T,
+            index=range(1, 13),
+            columns=years
+        ).dropna(axis=1, how='all')
+        aggs['period_stats'] = df.groupby('Period', sort=False, observed=True)['Temp_Mean'].mean()
+        # Moyenne mobile 30 j centrée, calculée une fois pour toutes les années
+        # au lieu d'un rolling par rerun ; jointe au daily avant le découpage par année
+        df = df.assign(Temp_MA=df.groupby('Year', sort=False, observed=True)['Temp_Mean'].transform(
+            lambda s: s.rolling(window=30, center=True).mean()
+        ))
+        aggs['all_avg_temp'] = float(np.nanmean(temp))
+        # Histogramme des deux périodes binné côté serveur sur des bords communs :
+        # le navigateur reçoit 2x50 effectifs au lieu des ~13k valeurs brutes
+        edges = np.linspace(np.nanmin(temp), np.nanmax(temp), 51)
+        aggs['period_hist_edges'] = edges
+        aggs['period_hist'] = {
+            period: np.histogram(group.dropna().to_numpy(), bins=edges)[0]
+            for period, group in df.groupby('Period', sort=False, observed=True)['Temp_Mean']
+        }
+
+    if 'Precipitation' in df.columns:
+        precip = df['Precipitation'].to_numpy(dtype=np.float64)
+        precip_sums, _ = grouped_sum_count(year_codes, precip, n_years)
+        aggs['yearly_precip'] = pd.DataFrame({
+            'Year': years,
+            'Precipitation': precip_sums
+        })
+        aggs['all_avg_precip'] = float(precip_sums.mean())
+
+    # Table (Season, Year) à deux niveaux : la page saisonnière fait une tranche
+    # .loc[season] sur le MultiIndex au lieu d'un masque + copy + deux groupbys
+    season_measures = {}
+    if 'Temp_Mean' in df.columns:
+        season_measures['temp_mean'] = ('Temp_Mean', 'mean')
+    if 'Precipitation' in df.columns:
+        season_measures['precip_sum'] = ('Precipitation', 'sum')
+    if season_measures:
+        aggs['season_year'] = df.groupby(['Season', 'Year'], sort=False, observed=True).agg(**season_measures)
+
+    if 'Temp_Mean' in df.columns and 'Precipitation' in df.columns:
+        aggs['decade_monthly'] = df.groupby(['Decade', 'Month'], observed=True)[['Temp_Mean', 'Precipitation']].mean().reset_index()
+
+    # Découpage par année fait une seule fois : la page profil annuel récupère
+    # son sous-DataFrame par lookup dict au lieu d'un masque booléen + .copy()
+    aggs['per_year'] = {
+        year: group.reset_index(drop=True)
+        for year, group in df.groupby('Year', sort=False, observed=True)
+    }
+
+    return aggs
+
+# Cache disque des agrégats : @st.cache_data est vidé à chaque redémarrage du
+# process ; on persiste le dict sous .cache/, clé = (mtime, taille) du fichier
+# source, pour qu'un démarrage à froid se réduise à une lecture + unpickle
+CACHE_DIR = '.cache'
+AGGREGATES_CACHE = os.path.join(CACHE_DIR, 'aggregates.pkl')
+
+@st.cache_data
+def load_aggregates(df):
+    data_file = PARQUET_FILE if os.path.exists(PARQUET_FILE) else CSV_FILE
+    stat = os.stat(data_file)
+    cache_key = (data_file, stat.st_mtime, stat.st_size)
+
+    try:
+        with open(AGGREGATES_CACHE, 'rb') as f:
+            stored_key, aggs = pickle.load(f)
+        if stored_key == cache_key:
+            return aggs
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    aggs = build_aggregates(df)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(AGGREGATES_CACHE, 'wb') as f:
+        pickle.dump((cache_key, aggs), f)
+    return aggs
+
 # Chargement des données
 df = load_data()
+aggs = load_aggregates(df)
 
 
 # ========================================
@@ -132,8 +240,8 @@ elif page == "2. ANALYSIS":
     if 'Temp_Mean' in df.columns:
         st.markdown("## Annual Average Temperature Evolution (1989-2024)")
         
-        yearly_temp = df.groupby('Year')['Temp_Mean'].mean().reset_index()
-        
+        yearly_temp = aggs['yearly_temp']
+
         fig1 = go.Figure()
         
         # Ligne de température
@@ -150,8 +258,7 @@ elif page == "2. ANALYSIS":
             title='Temperature Warming Trend Over 35 Years',
             xaxis_title='Year',
             yaxis_title='Temperature (°C)',
-            hovermode='x unified',
-            height=500
+            **BASE_LAYOUT
         )
         
         st.plotly_chart(fig1, use_container_width=True)
@@ -174,8 +281,8 @@ elif page == "2. ANALYSIS":
     if 'Precipitation' in df.columns:
         st.markdown("## Annual Precipitation Evolution")
         
-        yearly_precip = df.groupby('Year')['Precipitation'].sum().reset_index()
-        
+        yearly_precip = aggs['yearly_precip']
+
         fig2 = go.Figure()
         
         fig2.add_trace(go.Scatter(
@@ -194,8 +301,7 @@ elif page == "2. ANALYSIS":
             title='Precipitation Pattern Changes',
             xaxis_title='Year',
             yaxis_title='Total Precipitation (mm)',
-            hovermode='x unified',
-            height=500
+            **BASE_LAYOUT
         )
         
         st.plotly_chart(fig2, use_container_width=True)
@@ -216,17 +322,18 @@ elif page == "2. ANALYSIS":
     if 'Temp_Mean' in df.columns:
         st.markdown("## Temperature Distribution Comparison (1989-2004 vs 2005-2024)")
         
-        df['Period'] = df['Year'].apply(lambda x: '1989-2004' if x <= 2004 else '2005-2024')
-        
+        edges = aggs['period_hist_edges']
+        bin_width = edges[1] - edges[0]
+
         fig3 = go.Figure()
-        
+
         for period in ['1989-2004', '2005-2024']:
-            period_data = df[df['Period'] == period]['Temp_Mean'].dropna()
-            fig3.add_trace(go.Histogram(
-                x=period_data,
+            fig3.add_trace(go.Bar(
+                x=edges[:-1] + bin_width / 2,
+                y=aggs['period_hist'][period],
+                width=bin_width,
                 name=period,
-                opacity=0.7,
-                nbinsx=50
+                opacity=0.7
             ))
         
         fig3.update_layout(
@@ -242,10 +349,10 @@ elif page == "2. ANALYSIS":
         # Stats comparatives
         col1, col2 = st.columns(2)
         with col1:
-            early_mean = df[df['Period'] == '1989-2004']['Temp_Mean'].mean()
+            early_mean = aggs['period_stats']['1989-2004']
             st.metric("1989-2004 Avg", f"{early_mean:.2f}°C")
         with col2:
-            recent_mean = df[df['Period'] == '2005-2024']['Temp_Mean'].mean()
+            recent_mean = aggs['period_stats']['2005-2024']
             delta = recent_mean - early_mean
             st.metric("2005-2024 Avg", f"{recent_mean:.2f}°C", f"+{delta:.2f}°C")
 
@@ -265,17 +372,19 @@ elif page == "2. ANALYSIS":
     if 'Temp_Mean' in df.columns:
         st.markdown("## Monthly Temperature Heatmap")
         
-        # Créer une pivot table
-        monthly_temp = df.pivot_table(
-            values='Temp_Mean',
-            index='Month',
-            columns='Year',
-            aggfunc='mean'
-        )
-        
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        
+        monthly_temp = aggs['monthly_pivot']
+
+        # Au-delà de ~200 colonnes-années, agréger les années par paquets côté
+        # serveur : la matrice envoyée au navigateur reste de taille bornée
+        # quelle que soit la profondeur de l'historique
+        max_heatmap_years = 200
+        if len(monthly_temp.columns) > max_heatmap_years:
+            bin_size = int(np.ceil(len(monthly_temp.columns) / max_heatmap_years))
+            year_bins = (monthly_temp.columns.astype('int64') // bin_size) * bin_size
+            monthly_temp = monthly_temp.T.groupby(year_bins).mean().T
+
+        month_names = MONTH_TICKS['ticktext']
+
         fig4 = go.Figure(data=go.Heatmap(
             z=monthly_temp.values,
             x=monthly_temp.columns,
@@ -310,23 +419,24 @@ elif page == "2. ANALYSIS":
     if 'Precipitation' in df.columns:
         st.markdown("## Monthly Precipitation Distribution")
         
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June',
-                       'July', 'August', 'September', 'October', 'November', 'December']
-        
+        # Une seule trace groupée par mois : Plotly fait le découpage en interne,
+        # au lieu de 12 scans booléens du DataFrame et 12 objets trace
+        precip_data = df.dropna(subset=['Precipitation'])
+
         fig5 = go.Figure()
-        
-        for month in month_order:
-            month_data = df[df['Month_Name'] == month]['Precipitation'].dropna()
-            fig5.add_trace(go.Box(
-                y=month_data,
-                name=month[:3],
-                boxmean='sd'
-            ))
-        
+
+        fig5.add_trace(go.Box(
+            x=precip_data['Month'],
+            y=precip_data['Precipitation'],
+            boxmean='sd',
+            showlegend=False
+        ))
+
         fig5.update_layout(
             title='Seasonal Precipitation Variability',
             xaxis_title='Month',
             yaxis_title='Precipitation (mm/day)',
+            xaxis=MONTH_TICKS,
             height=500
         )
         
@@ -356,18 +466,18 @@ if page == "3. INTERACTIVE INSIGHTS":
 
     selected_year = st.selectbox(
         "Select a year to explore:",
-        options=sorted(df['Year'].unique(), reverse=True),
+        options=sorted(aggs['per_year'], reverse=True),
         index=0
     )
 
-    year_data = df[df['Year'] == selected_year].copy()
+    year_data = aggs['per_year'][selected_year]
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         if 'Temp_Mean' in df.columns:
             year_avg_temp = year_data['Temp_Mean'].mean()
-            all_avg_temp = df['Temp_Mean'].mean()
+            all_avg_temp = aggs['all_avg_temp']
             delta_temp = year_avg_temp - all_avg_temp
             st.metric(
                 f"🌡️ Avg Temp {selected_year}",
@@ -378,7 +488,7 @@ if page == "3. INTERACTIVE INSIGHTS":
     with col2:
         if 'Precipitation' in df.columns:
             year_precip = year_data['Precipitation'].sum()
-            all_avg_precip = df.groupby('Year')['Precipitation'].sum().mean()
+            all_avg_precip = aggs['all_avg_precip']
             delta_precip = year_precip - all_avg_precip
             st.metric(
                 f"💧 Total Precip {selected_year}",
@@ -401,27 +511,29 @@ if page == "3. INTERACTIVE INSIGHTS":
 
     # Graphique de l'année sélectionnée
     if 'Temp_Mean' in df.columns:
-        fig7 = go.Figure()
-        
-        fig7.add_trace(go.Scatter(
-            x=year_data['Date'],
-            y=year_data['Temp_Mean'],
+        fig7 = make_resampled_figure()
+
+        add_daily_trace(
+            fig7,
+            year_data['Date'],
+            year_data['Temp_Mean'],
             mode='lines',
             name='Daily Temperature',
             line=dict(color='#e74c3c', width=1),
             fill='tozeroy',
             fillcolor='rgba(231, 76, 60, 0.2)'
-        ))
-        
-        # Moyenne mobile sur 30 jours
-        year_data['Temp_MA'] = year_data['Temp_Mean'].rolling(window=30, center=True).mean()
-        fig7.add_trace(go.Scatter(
-            x=year_data['Date'],
-            y=year_data['Temp_MA'],
+        )
+
+        # Moyenne mobile sur 30 jours : pré-calculée pour toutes les années dans
+        # les agrégats (downsampling après rolling)
+        add_daily_trace(
+            fig7,
+            year_data['Date'],
+            year_data['Temp_MA'],
             mode='lines',
             name='30-day Moving Average',
             line=dict(color='#c0392b', width=3)
-        ))
+        )
         
         fig7.update_layout(
             title=f'Daily Temperature Profile for {selected_year}',
@@ -448,9 +560,6 @@ if page == "3. INTERACTIVE INSIGHTS":
             horizontal=True
         )
         
-        # Créer des décennies
-        df['Decade'] = (df['Year'] // 10) * 10
-        
         # Sélectionner la variable et configurer le graphique en fonction du choix
         if selected_var == 'Temperature':
             plot_var = 'Temp_Mean'
@@ -463,34 +572,27 @@ if page == "3. INTERACTIVE INSIGHTS":
             title = 'Monthly Precipitation by Decade'
             color_scale = 'Blues'
         
-        monthly_by_decade = df.groupby(['Decade', 'Month'])[plot_var].mean().reset_index()
-        
-        fig8 = go.Figure()
-        
-        decades = sorted(monthly_by_decade['Decade'].unique())
-        colors = px.colors.qualitative.Set2
-        
-        for i, decade in enumerate(decades):
-            decade_data = monthly_by_decade[monthly_by_decade['Decade'] == decade]
-            fig8.add_trace(go.Scatter(
-                x=decade_data['Month'],
-                y=decade_data[plot_var].values,
-                mode='lines+markers',
-                name=f'{decade}s',
-                line=dict(width=2.5, color=colors[i % len(colors)]),
-                marker=dict(size=7)
-            ))
-        
+        monthly_by_decade = aggs['decade_monthly']
+
+        # Une seule passe px.line avec color= : Plotly découpe les décennies en
+        # interne, au lieu d'un masque booléen + un go.Scatter par décennie
+        fig8 = px.line(
+            monthly_by_decade,
+            x='Month',
+            y=plot_var,
+            color='Decade',
+            markers=True,
+            color_discrete_sequence=px.colors.qualitative.Set2
+        )
+        fig8.update_traces(line=dict(width=2.5), marker=dict(size=7))
+        fig8.for_each_trace(lambda trace: trace.update(name=f'{trace.name}s'))
+
         fig8.update_layout(
             title=title,
             xaxis_title='Month',
             yaxis_title=y_label,
-            xaxis=dict(tickmode='array', 
-                      tickvals=list(range(1, 13)),
-                      ticktext=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']),
-            height=500,
-            hovermode='x unified',
+            xaxis=MONTH_TICKS,
+            **BASE_LAYOUT,
             showlegend=True,
             legend=dict(
                 yanchor="top",
@@ -523,23 +625,21 @@ if page == "3. INTERACTIVE INSIGHTS":
         options=['Winter', 'Spring', 'Summer', 'Fall']
     )
 
-    season_data = df[df['Season'] == season].copy()
+    season_yearly = aggs['season_year'].loc[season].reset_index()
 
     col1, col2 = st.columns(2)
 
     with col1:
         if 'Temp_Mean' in df.columns:
             # Évolution de la température saisonnière
-            season_yearly = season_data.groupby('Year')['Temp_Mean'].mean().reset_index()
-            
             fig9a = go.Figure()
-            
+
             fig9a.add_trace(go.Scatter(
                 x=season_yearly['Year'],
-                y=season_yearly['Temp_Mean'],
+                y=season_yearly['temp_mean'],
                 mode='markers',
                 name=f'{season} Temperature',
-                marker=dict(size=10, color=season_yearly['Temp_Mean'],
+                marker=dict(size=10, color=season_yearly['temp_mean'],
                            colorscale='RdYlBu_r', showscale=True,
                            colorbar=dict(title='°C'))
             ))
@@ -557,19 +657,17 @@ if page == "3. INTERACTIVE INSIGHTS":
     with col2:
         if 'Precipitation' in df.columns:
             # Évolution des précipitations saisonnières
-            season_precip = season_data.groupby('Year')['Precipitation'].sum().reset_index()
-            
             fig9b = go.Figure()
-            
+
             fig9b.add_trace(go.Bar(
-                x=season_precip['Year'],
-                y=season_precip['Precipitation'],
+                x=season_yearly['Year'],
+                y=season_yearly['precip_sum'],
                 name=f'{season} Precipitation',
                 marker_color='#3498db'
             ))
-            
+
             # Moyenne
-            avg_precip = season_precip['Precipitation'].mean()
+            avg_precip = season_yearly['precip_sum'].mean()
             fig9b.add_hline(
                 y=avg_precip,
                 line_dash="dash",
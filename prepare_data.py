@@ -0,0 +1,204 @@
+"""Prétraitement one-shot : convertit le CSV journalier de la station en Parquet typé.
+
+Le CSV est re-parsé (détection de colonnes + to_datetime) à chaque démarrage à froid
+du dashboard ; ce script fait ce travail une seule fois et écrit `station.parquet`
+avec des colonnes déjà typées (float32 pour les mesures, int16/int8 pour les
+composants temporels). `dashboard.py` lit ensuite directement le Parquet.
+
+Usage : python prepare_data.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+CSV_FILE = 'Station_Agroclim_INRAE_11170004_daily_1989_2024.csv'
+PARQUET_FILE = 'station.parquet'
+SCHEMA_FILE = 'schema.json'
+
+# Colonnes conservées dans le Parquet (les seules utilisées par le dashboard)
+OUTPUT_COLUMNS = ['Date', 'Year', 'Month', 'Day', 'Month_Name', 'Season',
+                  'Period', 'Decade', 'Temp_Mean', 'Temp_Max', 'Temp_Min',
+                  'Precipitation']
+
+
+def read_daily_csv(path=CSV_FILE):
+    """Parse le CSV journalier avec le lecteur multithreadé de PyArrow
+    (copie zéro vers pandas), repli sur pandas.read_csv sans PyArrow."""
+    try:
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return pd.read_csv(path)
+    return pacsv.read_csv(path).to_pandas()
+
+
+def detect_column_roles(columns):
+    """Heuristiques de détection des colonnes date/température/précipitations.
+
+    Retourne un mapping rôle -> colonne source ('temp_mean' est une liste :
+    une colonne, ou deux colonnes min/max à moyenner)."""
+
+    roles = {}
+
+    # Détection automatique de la colonne de date
+    date_cols = [col for col in columns if 'date' in col.lower() or 'time' in col.lower()]
+    if date_cols:
+        roles['date'] = date_cols[0]
+
+    # Identification des colonnes de température (colonnes contenant 'temp', 'T_', 'TX', 'TN', etc.)
+    temp_cols = [col for col in columns if any(x in col.lower() for x in ['temp', 't_', 'tx', 'tn', 'tg'])]
+
+    # Identification des colonnes de précipitations
+    precip_cols = [col for col in columns if any(x in col.lower() for x in ['precip', 'rain', 'rr', 'pluvio', 'pluie'])]
+
+    if temp_cols:
+        # Chercher température moyenne
+        temp_mean_cols = [col for col in temp_cols if 'mean' in col.lower() or 'avg' in col.lower() or 'tg' in col.lower() or 'moy' in col.lower()]
+        if temp_mean_cols:
+            roles['temp_mean'] = [temp_mean_cols[0]]
+        elif len(temp_cols) >= 2:
+            # Si on a min et max, calculer la moyenne
+            roles['temp_mean'] = temp_cols[:2]
+        else:
+            roles['temp_mean'] = [temp_cols[0]]
+
+        # Chercher température max
+        temp_max_cols = [col for col in temp_cols if 'max' in col.lower() or 'tx' in col.lower()]
+        if temp_max_cols:
+            roles['temp_max'] = temp_max_cols[0]
+
+        # Chercher température min
+        temp_min_cols = [col for col in temp_cols if 'min' in col.lower() or 'tn' in col.lower()]
+        if temp_min_cols:
+            roles['temp_min'] = temp_min_cols[0]
+
+    if precip_cols:
+        roles['precip'] = precip_cols[0]
+
+    return roles
+
+
+def load_column_roles(columns):
+    """Rôles des colonnes, épinglés dans schema.json.
+
+    Le sidecar rend le mapping déterministe et dispense de re-dérouler les
+    heuristiques à chaque démarrage ; s'il est absent, incohérent avec les
+    colonnes présentes ou illisible, on détecte puis on le (ré)écrit."""
+
+    if os.path.exists(SCHEMA_FILE):
+        try:
+            with open(SCHEMA_FILE) as f:
+                roles = json.load(f)
+            referenced = [col for value in roles.values()
+                          for col in (value if isinstance(value, list) else [value])]
+            if all(col in columns for col in referenced):
+                return roles
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    roles = detect_column_roles(columns)
+    try:
+        with open(SCHEMA_FILE, 'w') as f:
+            json.dump(roles, f, indent=2)
+    except OSError:
+        pass
+    return roles
+
+
+def standardize_columns(df):
+    """Renomme les colonnes date/température/précipitations du CSV brut selon
+    les rôles résolus et ajoute les colonnes dérivées attendues par le dashboard."""
+
+    roles = load_column_roles(list(df.columns))
+
+    if 'date' in roles:
+        df['Date'] = pd.to_datetime(df[roles['date']])
+    else:
+        # Si pas de colonne date explicite, essayer la première colonne
+        df['Date'] = pd.to_datetime(df.iloc[:, 0])
+
+    # Extraction des composants temporels
+    df['Year'] = df['Date'].dt.year
+    df['Month'] = df['Date'].dt.month
+    df['Day'] = df['Date'].dt.day
+    # Lookup int -> nom de mois : évite de formatter ~13k timestamps via strftime
+    month_lut = np.array(['', 'January', 'February', 'March', 'April', 'May', 'June',
+                          'July', 'August', 'September', 'October', 'November', 'December'])
+    df['Month_Name'] = month_lut[df['Month'].values]
+    # Colonnes dérivées vectorisées (lookup NumPy au lieu de map/apply ligne à ligne)
+    season_lut = np.array(['', 'Winter', 'Winter', 'Spring', 'Spring', 'Spring',
+                           'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter'])
+    df['Season'] = season_lut[df['Month'].values]
+    df['Period'] = np.where(df['Year'].values <= 2004, '1989-2004', '2005-2024')
+    df['Decade'] = (df['Year'].values // 10) * 10
+
+    # Renommage standard à partir des rôles résolus
+    if 'temp_mean' in roles:
+        mean_cols = roles['temp_mean']
+        if len(mean_cols) == 1:
+            df['Temp_Mean'] = df[mean_cols[0]]
+        else:
+            # Deux colonnes (min et max) : calculer la moyenne
+            df['Temp_Mean'] = (df[mean_cols[0]] + df[mean_cols[1]]) / 2
+
+    if 'temp_max' in roles:
+        df['Temp_Max'] = df[roles['temp_max']]
+
+    if 'temp_min' in roles:
+        df['Temp_Min'] = df[roles['temp_min']]
+
+    if 'precip' in roles:
+        df['Precipitation'] = df[roles['precip']]
+
+    # Mesures en float32 : moitié moins d'octets à déplacer dans les réductions
+    # (groupby/pivot/rolling sont memory-bound), Day en int8
+    for col in ['Temp_Mean', 'Temp_Max', 'Temp_Min', 'Precipitation']:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    df['Day'] = df['Day'].astype('int8')
+
+    # Nettoyage des valeurs manquantes
+    df = df.dropna(subset=['Date'])
+
+    return as_categorical_keys(df)
+
+
+def as_categorical_keys(df):
+    """Convertit les clés de groupby en Categorical : les agrégations travaillent
+    alors sur des codes entiers contigus (avec observed=True) au lieu de
+    reconstruire une table de hachage sur int64/str à chaque appel.
+
+    Appelé aussi après read_parquet : le Parquet ne restitue pas le dtype
+    category pour les colonnes à catégories entières (Year/Month/Decade)."""
+
+    df['Year'] = pd.Categorical(df['Year'],
+                                categories=range(df['Year'].min(), df['Year'].max() + 1),
+                                ordered=True)
+    df['Month'] = pd.Categorical(df['Month'], categories=range(1, 13), ordered=True)
+    df['Season'] = pd.Categorical(df['Season'],
+                                  categories=['Winter', 'Spring', 'Summer', 'Fall'])
+    df['Period'] = pd.Categorical(df['Period'],
+                                  categories=['1989-2004', '2005-2024'], ordered=True)
+    df['Decade'] = pd.Categorical(df['Decade'],
+                                  categories=range(df['Decade'].min(), df['Decade'].max() + 10, 10),
+                                  ordered=True)
+
+    return df
+
+
+def main():
+    df = standardize_columns(read_daily_csv())
+
+    # Ne garder que les colonnes utiles (les dtypes sont déjà resserrés par
+    # standardize_columns : float32 pour les mesures, codes catégoriels compacts
+    # pour les clés temporelles)
+    df = df[[col for col in OUTPUT_COLUMNS if col in df.columns]].copy()
+
+    df.to_parquet(PARQUET_FILE, engine='pyarrow', index=False)
+    print(f"{PARQUET_FILE} écrit : {len(df)} lignes, {df.memory_usage(deep=True).sum() / 1e6:.1f} Mo en mémoire")
+
+
+if __name__ == '__main__':
+    main()